@@ -1,13 +1,25 @@
 import os
+import bisect
 import datetime
+import hashlib
+import heapq
 import logging
+import math
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import caldav
-from flask import Flask, render_template, abort
-from dateutil import tz
-from dateutil.parser import parse
+from caldav.elements import dav
+from caldav.elements.base import ValuedBaseElement
+from flask import Flask, render_template, abort, make_response, request
 from astral import LocationInfo
-from astral.sun import sun
-from babel import dates
+from astral import sun as astral_sun
+from babel import Locale, UnknownLocaleError, dates
 import translations
 
 app = Flask(__name__)
@@ -28,11 +40,86 @@ LATITUDE = os.environ.get('LATITUDE')
 LONGITUDE = os.environ.get('LONGITUDE')
 LANGUAGE = os.environ.get('LANGUAGE', os.environ.get('LANG', 'en')).split('.')[0]
 THEME = os.environ.get('THEME', 'auto').lower()
+CACHE_FILE = os.environ.get('CACHE_FILE')
+
+# Resolve the timezone once and share the instance everywhere
+try:
+    LOCAL_TZ = ZoneInfo(TIMEZONE_STR)
+except (ZoneInfoNotFoundError, ValueError, OSError):
+    logger.warning(f"Unknown timezone '{TIMEZONE_STR}', falling back to UTC")
+    LOCAL_TZ = datetime.timezone.utc
+
+# IANA name of LOCAL_TZ (None for the UTC fallback), for matching pytz zones
+_LOCAL_TZ_KEY = getattr(LOCAL_TZ, 'key', None)
+
+# Static UI strings for the configured LANGUAGE
+UI_TEXT = {key: translations.get_text(LANGUAGE, key) for key in ('today', 'no_events', 'all_day')}
+
+# Babel locale and date pattern, parsed once
+try:
+    BABEL_LOCALE = Locale.parse(LANGUAGE)
+except (ValueError, UnknownLocaleError):
+    logger.warning(f"Unknown locale '{LANGUAGE}', formatting dates as '{translations.DEFAULT_LANGUAGE}'")
+    BABEL_LOCALE = Locale.parse(translations.DEFAULT_LANGUAGE)
+_DATE_PATTERN = dates.parse_pattern('MMM d')
+# Upper-cased full weekday names (pattern 'EEEE'), indexed by date.weekday()
+_WEEKDAY_NAMES = tuple(BABEL_LOCALE.days['format']['wide'][i].upper() for i in range(7))
+
+# Observer location for the automatic theme, parsed once
+LOCATION = None
+if LATITUDE and LONGITUDE:
+    try:
+        LOCATION = LocationInfo("Custom", "Region", TIMEZONE_STR, float(LATITUDE), float(LONGITUDE))
+    except ValueError as e:
+        logger.error(f"Invalid LATITUDE/LONGITUDE, automatic theme disabled: {e}")
+
+# Light-mode window for the current day
+# Structure: {'date': date, 'light_start_ts': epoch seconds, 'light_end_ts': epoch seconds}
+# (both None on days without sunrise or sunset)
+_SUN_CACHE = {'date': None, 'light_start_ts': None, 'light_end_ts': None}
 
 # Simple in-memory cache
-# Structure: {'timestamp': datetime, 'data': {...}}
-CACHE = {}
+# Structure: {'expires_at': monotonic seconds, 'data': {...},
+#             'timestamp': UTC datetime the data was built,
+#             'window': (search start, search end, _CONFIG_KEY),
+#             'ctags': [(calendar url, ctag), ...],
+#             'fingerprint': (window, ((event url, etag), ...))}
+CACHE = {'expires_at': 0.0, 'data': None, 'timestamp': None, 'window': None, 'ctags': None,
+         'fingerprint': None}
+# CACHE entries shared between worker processes through CACHE_FILE
+_SHARED_CACHE_KEYS = frozenset({'data', 'timestamp', 'window', 'ctags', 'fingerprint'})
+CLIENT_MAX_AGE = 60  # Seconds browsers may reuse the page without revalidating
 CACHE_DURATION = 900  # 15 minutes in seconds
+MAX_FETCH_WORKERS = 8  # Upper bound for concurrent calendar fetches
+
+# CalDAV connection state, kept for the lifetime of the process so the HTTP
+# session (keep-alive connections) and calendar discovery survive between
+# cache refreshes. Reset after errors so the next refresh reconnects.
+# 'targets' keeps the discovered calendar URLs across resets so calendars
+# can be rebuilt without principal discovery; 'rebuilt' marks calendars
+# built from 'targets' that have not completed a fetch yet.
+# Structure: {'client': DAVClient, 'calendars': [(calendar, color), ...],
+#             'targets': [(url, name, color), ...], 'rebuilt': bool}
+_CALDAV = {'client': None, 'calendars': None, 'targets': None, 'rebuilt': False}
+_CALDAV_LOCK = threading.Lock()
+
+# View built from the cached data for the current day. 'data' holds the
+# fetch_events() result it was built from; a refresh replaces that object,
+# so an identity check detects new data.
+# Structure: {'today': date, 'data': {...}, 'columns': [...], 'all_day_events': [...]}
+RENDER_CACHE = {'today': None, 'data': None, 'columns': None, 'all_day_events': None}
+
+# Parsed events per CalDAV resource, least recently used first
+# Structure: {(url, etag, search_start): (timed, all_day)}
+EVENT_CACHE = OrderedDict()
+EVENT_CACHE_SIZE = 2048
+
+# Julian epoch J2000.0 (2000-01-01 12:00 UTC) for the sunrise equation
+_J2000 = datetime.datetime(2000, 1, 1, 12, tzinfo=datetime.timezone.utc)
+
+# Day arithmetic for the visible range; DAYS_TO_SHOW is fixed at startup
+_DAY = datetime.timedelta(days=1)
+_DAY_OFFSETS = tuple(i * _DAY for i in range(DAYS_TO_SHOW))
 
 DEFAULT_PALETTE = [
     '#2962ff', # Blue
@@ -44,38 +131,101 @@ DEFAULT_PALETTE = [
     '#c51162', # Pink
 ]
 
-def get_timezone():
-    return tz.gettz(TIMEZONE_STR)
+def _sunrise_sunset(day, lat, lon, tz=datetime.timezone.utc):
+    """
+    Approximates sunrise and sunset for the given day with the closed-form
+    sunrise equation (within a few minutes of astral outside polar regions).
+    'day' is a calendar date in 'tz'. Returns aware UTC datetimes. Raises
+    ValueError if the sun does not rise or set on that day.
+    """
+    # Mean solar noon (days since J2000.0, longitude east-positive) closest
+    # to local clock noon. Anchoring on the UTC date instead picks the wrong
+    # solar day where the UTC offset and longitude disagree by over 12h
+    # (e.g. Pacific/Apia).
+    local_noon = datetime.datetime.combine(day, datetime.time(12), tzinfo=tz)
+    local_noon_days = (local_noon - _J2000).total_seconds() / 86400.0
+    j_noon = round(local_noon_days + lon / 360.0) - lon / 360.0
+
+    m = math.radians((357.5291 + 0.98560028 * j_noon) % 360)
+    center = 1.9148 * math.sin(m) + 0.0200 * math.sin(2 * m) + 0.0003 * math.sin(3 * m)
+    ecliptic_lon = math.radians((math.degrees(m) + center + 180 + 102.9372) % 360)
+    j_transit = j_noon + 0.0053 * math.sin(m) - 0.0069 * math.sin(2 * ecliptic_lon)
+
+    sin_decl = math.sin(ecliptic_lon) * math.sin(math.radians(23.4397))
+    cos_decl = math.cos(math.asin(sin_decl))
+    phi = math.radians(lat)
+    cos_hour_angle = (
+        (math.sin(math.radians(-0.833)) - math.sin(phi) * sin_decl)
+        / (math.cos(phi) * cos_decl)
+    )
+    if not -1.0 <= cos_hour_angle <= 1.0:
+        raise ValueError(f"No sunrise/sunset on {day} at latitude {lat}")
+
+    half_day = math.degrees(math.acos(cos_hour_angle)) / 360.0
+    sunrise = _J2000 + datetime.timedelta(days=j_transit - half_day)
+    sunset = _J2000 + datetime.timedelta(days=j_transit + half_day)
+    return sunrise, sunset
+
+def _sun_window(day):
+    """
+    Returns the (light_start, light_end) window for the given day as epoch
+    seconds, so callers compare plain floats, or (None, None) if the sun
+    does not rise or set that day. Sun events only change once per day, so
+    the window is kept in _SUN_CACHE until the date changes.
+    """
+    if _SUN_CACHE['date'] != day:
+        try:
+            sunrise, sunset = _sunrise_sunset(day, LOCATION.latitude, LOCATION.longitude, LOCAL_TZ)
+        except ValueError:
+            # Near-polar edge cases: defer to astral's iterative solver
+            try:
+                sunrise = astral_sun.sunrise(LOCATION.observer, date=day, tzinfo=LOCAL_TZ)
+                sunset = astral_sun.sunset(LOCATION.observer, date=day, tzinfo=LOCAL_TZ)
+            except ValueError as e:
+                # Polar day or night; cached as an empty window so the
+                # solver runs (and this logs) once per day only
+                logger.warning(f"No sunrise/sunset on {day}, using the dark theme: {e}")
+                sunrise = sunset = None
+
+        if sunrise is None:
+            _SUN_CACHE['light_start_ts'] = None
+            _SUN_CACHE['light_end_ts'] = None
+        else:
+            _SUN_CACHE['light_start_ts'] = sunrise.timestamp() + 45 * 60
+            _SUN_CACHE['light_end_ts'] = sunset.timestamp() - 30 * 60
+        _SUN_CACHE['date'] = day
+
+    return _SUN_CACHE['light_start_ts'], _SUN_CACHE['light_end_ts']
+
+@lru_cache(maxsize=512)
+def _format_date(day):
+    """Formats a date as 'MMM d' for the configured LANGUAGE, memoizing the result."""
+    return _DATE_PATTERN.apply(day, BABEL_LOCALE)
 
-def get_theme_mode():
+def get_theme_mode(now=None):
     """
     Determines if the theme should be 'light' or 'dark'.
     Checks THEME env var first, then calculates based on sun position if 'auto'.
     Light mode: Sunrise + 45min < NOW < Sunset - 30min
+    'now' is an aware datetime in LOCAL_TZ; defaults to the current time.
     """
     if THEME in ['light', 'dark']:
         return THEME
 
     if not LATITUDE or not LONGITUDE:
         return 'dark' # Default fallback
+
+    if LOCATION is None:
+        return 'dark' # Invalid coordinates, reported at startup
         
     try:
-        local_tz = get_timezone()
-        now = datetime.datetime.now(local_tz)
-        
-        # Setup location
-        l = LocationInfo("Custom", "Region", TIMEZONE_STR, float(LATITUDE), float(LONGITUDE))
+        if now is None:
+            now = datetime.datetime.now(LOCAL_TZ)
+        light_start, light_end = _sun_window(now.date())
+        if light_start is None:
+            return 'dark' # Polar day or night, reported once per day
         
-        # Calculate sun events
-        s = sun(l.observer, date=now.date(), tzinfo=local_tz)
-        sunrise = s['sunrise']
-        sunset = s['sunset']
-        
-        # Define window
-        light_start = sunrise + datetime.timedelta(minutes=45)
-        light_end = sunset - datetime.timedelta(minutes=30)
-        
-        if light_start < now < light_end:
+        if light_start < now.timestamp() < light_end:
             return 'light'
         else:
             return 'dark'
@@ -84,84 +234,96 @@ def get_theme_mode():
         logger.error(f"Error calculating theme: {e}")
         return 'dark'
 
-def get_date_range():
-    """Returns a list of datetime.date objects for the configured range (default 5 days)"""
-    local_tz = get_timezone()
-    now = datetime.datetime.now(local_tz)
+def get_date_range(now=None):
+    """
+    Returns a list of datetime.date objects for the configured range (default 5 days).
+    'now' is an aware datetime in LOCAL_TZ; defaults to the current time.
+    """
+    if now is None:
+        now = datetime.datetime.now(LOCAL_TZ)
     today = now.date()
-    yesterday = today - datetime.timedelta(days=1)
-    
-    days = []
-    for i in range(DAYS_TO_SHOW):
-        days.append(yesterday + datetime.timedelta(days=i))
-    return days
+    yesterday = today - _DAY
+    return [yesterday + offset for offset in _DAY_OFFSETS]
 
 def parse_calendars_config():
     """
     Parses CALENDARS env var or falls back to CALENDAR_NAME.
     Returns a dict: {'Calendar Name': 'ColorHex'}
     """
-    logger.info(f"Parsing config. CALENDARS='{CALENDARS_CONFIG}', CALENDAR_NAME='{CALENDAR_NAME}'")
+    logger.debug("Parsing config. CALENDARS='%s', CALENDAR_NAME='%s'", CALENDARS_CONFIG, CALENDAR_NAME)
     targets = {}
     
     if CALENDARS_CONFIG:
         # Parse comma separated list
         parts = [x.strip() for x in CALENDARS_CONFIG.split(',') if x.strip()]
-        logger.info(f"Found {len(parts)} config parts: {parts}")
+        logger.debug("Found %d config parts: %s", len(parts), parts)
         
         for i, part in enumerate(parts):
             if ':' in part:
                 name, color = part.rsplit(':', 1)
                 targets[name.strip()] = color.strip()
-                logger.info(f"Parsed explicit color: {name.strip()} -> {color.strip()}")
+                logger.debug("Parsed explicit color: %s -> %s", name.strip(), color.strip())
             else:
                 # Assign default color based on index
                 color = DEFAULT_PALETTE[i % len(DEFAULT_PALETTE)]
                 targets[part.strip()] = color
-                logger.info(f"Assigned default color: {part.strip()} -> {color}")
+                logger.debug("Assigned default color: %s -> %s", part.strip(), color)
                 
     elif CALENDAR_NAME:
         # Fallback to single legacy calendar
         targets[CALENDAR_NAME] = DEFAULT_PALETTE[0]
-        logger.info(f"Using legacy CALENDAR_NAME: {CALENDAR_NAME}")
+        logger.debug("Using legacy CALENDAR_NAME: %s", CALENDAR_NAME)
         
     logger.info(f"Final calendar configuration: {targets}")
     return targets
 
+# The configuration comes from the environment and cannot change at runtime
+TARGET_CONFIG = parse_calendars_config()
 
-def fetch_events():
-    """
-    Fetches events from CalDAV or returns cached data.
-    Supports multiple calendars via CALENDARS config or legacy CALENDAR_NAME.
-    """
-    global CACHE
-    now = datetime.datetime.now()
-    
-    # Check cache
-    if 'timestamp' in CACHE:
-        age = (now - CACHE['timestamp']).total_seconds()
-        if age < CACHE_DURATION:
-            logger.info(f"Serving from cache ({int(age)}s old)")
-            return CACHE['data']
+# Settings the fetched data depends on beyond the search range. Part of the
+# cache window, so data shared through CACHE_FILE by a process started with
+# other settings is never adopted.
+_CONFIG_KEY = (ICLOUD_URL, ICLOUD_USERNAME, str(LOCAL_TZ), tuple(TARGET_CONFIG.items()))
 
-    if not ICLOUD_USERNAME or not ICLOUD_PASSWORD:
-        logger.warning("No credentials provided. Returning empty list.")
-        return {}
 
-    try:
+def _get_client():
+    """Returns the shared DAVClient, creating it on first use."""
+    if _CALDAV['client'] is None:
         logger.info("Connecting to CalDAV...")
-        client = caldav.DAVClient(
+        _CALDAV['client'] = caldav.DAVClient(
             url=ICLOUD_URL,
             username=ICLOUD_USERNAME,
             password=ICLOUD_PASSWORD
         )
-        principal = client.principal()
+    return _CALDAV['client']
+
+def _get_calendars():
+    """
+    Returns the calendars to fetch as a list of (calendar, color) tuples.
+    Discovery costs several PROPFIND round-trips, so the result is kept
+    until reset_caldav() is called, and afterwards the calendars are
+    rebuilt from their known URLs. Nothing is kept while a configured
+    calendar is missing, so newly created calendars are picked up.
+    """
+    with _CALDAV_LOCK:
+        if _CALDAV['calendars'] is not None:
+            return _CALDAV['calendars']
+
+        if _CALDAV['targets'] is not None:
+            client = _get_client()
+            _CALDAV['calendars'] = [
+                (caldav.Calendar(client=client, url=url, name=name), color)
+                for url, name, color in _CALDAV['targets']
+            ]
+            _CALDAV['rebuilt'] = True
+            return _CALDAV['calendars']
+
+        principal = _get_client().principal()
         calendars = principal.calendars()
-        
-        target_config = parse_calendars_config()
         calendars_to_fetch = []
+        complete = True
 
-        if not target_config:
+        if not TARGET_CONFIG:
             # Fallback: No config provided, try to use first calendar
             if calendars:
                 logger.info(f"No calendar config. Defaulting to first found: {calendars[0].name}")
@@ -171,187 +333,455 @@ def fetch_events():
             # Optimization: Map available calendars by name for O(1) lookup
             available_map = {cal.name: cal for cal in calendars}
             
-            for name, color in target_config.items():
+            for name, color in TARGET_CONFIG.items():
                 if name in available_map:
                     calendars_to_fetch.append((available_map[name], color))
                 else:
                     logger.warning(f"Configured calendar '{name}' not found on server.")
+                    complete = False
+
+        if calendars_to_fetch and complete:
+            _CALDAV['calendars'] = calendars_to_fetch
+            _CALDAV['targets'] = [(cal.url, cal.name, color) for cal, color in calendars_to_fetch]
+        return calendars_to_fetch
+
+def reset_caldav():
+    """
+    Drops the shared client and calendars, forcing a reconnect. The known
+    calendar URLs are dropped too if calendars rebuilt from them failed
+    before completing a fetch, so the next refresh rediscovers them.
+    """
+    with _CALDAV_LOCK:
+        _CALDAV['client'] = None
+        _CALDAV['calendars'] = None
+        if _CALDAV['rebuilt']:
+            _CALDAV['targets'] = None
+            _CALDAV['rebuilt'] = False
+
+class GetCTag(ValuedBaseElement):
+    """CalendarServer collection tag, changed on every modification."""
+    tag = "{http://calendarserver.org/ns/}getctag"
+
+def get_ctag(calendar):
+    """
+    Returns the calendar's CTag (a PROPFIND on the collection only),
+    or None if the server does not expose one.
+    """
+    return calendar.get_properties([GetCTag()]).get(GetCTag.tag)
+
+def _hhmm(dt):
+    """Formats a datetime as 'HH:MM' without going through strftime."""
+    return f"{dt.hour:02d}:{dt.minute:02d}"
+
+def _to_local(dt):
+    """
+    Converts a datetime to LOCAL_TZ. Naive values are treated as UTC.
+    Values already in the local zone are returned as-is: the iCalendar
+    parsers attach pytz zones, which are never the LOCAL_TZ object but
+    carry the same name in 'zone', and their wall time is already local.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    elif dt.tzinfo is LOCAL_TZ:
+        return dt
+    elif _LOCAL_TZ_KEY is not None and getattr(dt.tzinfo, 'zone', None) == _LOCAL_TZ_KEY:
+        return dt
+    return dt.astimezone(LOCAL_TZ)
+
+def parse_event(event, color):
+    """
+    Extracts the display fields from a single CalDAV resource.
+    Returns a tuple (timed, all_day): 'timed' is a list of
+    (date_key, seconds_of_day, event) triples, 'all_day' a list of events.
+    Expanded recurrences yield several entries per resource.
+    """
+    timed = []
+    all_day = []
+
+    # Module globals used per component, bound once as locals
+    datetime_type = datetime.datetime
+    to_local = _to_local
+    hhmm = _hhmm
+    one_day = _DAY
+
+    # search() has already parsed the resource with icalendar (and expanded
+    # recurrences in that tree); reading event.instance would serialize it
+    # and parse it a second time with vobject.
+    # Handle single or multiple VEVENT components (expanded recurrence)
+    calendar_data = event.icalendar_instance
+    vevents = calendar_data.walk('VEVENT') if calendar_data is not None else []
+
+    for ical_data in vevents:
+        summary = str(ical_data.get('summary', ''))
+        
+        # Optional fields: a single lookup each
+        description_prop = ical_data.get('description')
+        description = str(description_prop) if description_prop is not None else ""
+
+        location_prop = ical_data.get('location')
+        location = str(location_prop) if location_prop is not None else ""
+        
+        dtstart = ical_data['dtstart'].dt
+        
+        dtend_prop = ical_data.get('dtend')
+        dtend = dtend_prop.dt if dtend_prop is not None else None
+
+        is_all_day = not isinstance(dtstart, datetime_type)
+        
+        if not is_all_day:
+            dtstart_local = to_local(dtstart)
+            date_key = dtstart_local.toordinal()
+            time_str = hhmm(dtstart_local)
+            
+            if dtend:
+                if isinstance(dtend, datetime_type):
+                    dtend_local = to_local(dtend)
+                    end_time_str = hhmm(dtend_local)
+                else:
+                     end_time_str = ""
+            else:
+                # Default to one hour; aware datetime arithmetic is wall-clock
+                # based too, so this matches adding a timedelta
+                end_time_str = f"{(dtstart_local.hour + 1) % 24:02d}:{dtstart_local.minute:02d}"
+
+            start_seconds = dtstart_local.hour * 3600 + dtstart_local.minute * 60 + dtstart_local.second
+            timed.append((date_key, start_seconds, {
+                'summary': summary,
+                'description': description,
+                'location': location,
+                'time': time_str,
+                'end_time': end_time_str,
+                'is_all_day': False,
+                'color': color  # Inject Color
+            }))
+
+        else:
+            if not dtend:
+                dtend = dtstart + one_day
+            elif dtend == dtstart:
+                 dtend = dtstart + one_day
+            
+            all_day.append({
+                'summary': summary,
+                'description': description,
+                'location': location,
+                'start': dtstart,
+                'end': dtend,
+                'is_all_day': True,
+                'color': color # Inject Color
+            })
+
+    return timed, all_day
+
+def _load_shared_cache(window):
+    """
+    Adopts the events stored in CACHE_FILE by another worker process if they
+    were fetched for the given window (search range and configuration) and
+    are younger than CACHE_DURATION.
+    Unreadable or malformed files are ignored.
+    Returns True if CACHE was updated.
+    """
+    if not CACHE_FILE:
+        return False
+
+    try:
+        # A stat is enough to rule out a stale file without unpickling it
+        age = time.time() - os.stat(CACHE_FILE).st_mtime
+        if age >= CACHE_DURATION:
+            return False
+        with open(CACHE_FILE, 'rb') as f:
+            shared = pickle.load(f)
+
+        # The file may come from another version of the app
+        if not isinstance(shared, dict) or not _SHARED_CACHE_KEYS <= shared.keys():
+            raise ValueError("unexpected content")
+        if (not isinstance(shared['data'], dict) or not isinstance(shared['ctags'], list)
+                or not isinstance(shared['timestamp'], datetime.datetime)):
+            raise ValueError("unexpected content")
+        if shared['window'] != window:
+            return False
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logger.warning(f"Could not read cache file '{CACHE_FILE}': {e}")
+        return False
+
+    CACHE['expires_at'] = time.monotonic() + CACHE_DURATION - age
+    for key in _SHARED_CACHE_KEYS:
+        CACHE[key] = shared[key]
+    return True
+
+def _store_shared_cache():
+    """
+    Writes CACHE to CACHE_FILE for other worker processes. The file is
+    written under a random name and swapped in atomically, so readers never
+    see a partial pickle.
+    """
+    if not CACHE_FILE:
+        return
+
+    shared = {key: CACHE[key] for key in _SHARED_CACHE_KEYS}
+    tmp_path = None
+    try:
+        # mkstemp creates the file exclusively with owner-only permissions
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(CACHE_FILE)),
+            prefix=os.path.basename(CACHE_FILE) + '.',
+            suffix='.tmp'
+        )
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(shared, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, CACHE_FILE)
+    except (OSError, pickle.PicklingError) as e:
+        logger.warning(f"Could not write cache file '{CACHE_FILE}': {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def fetch_events(now=None):
+    """
+    Fetches events from CalDAV or returns cached data.
+    Supports multiple calendars via CALENDARS config or legacy CALENDAR_NAME.
+    'now' is an aware datetime in LOCAL_TZ; defaults to the current time.
+    """
+    # Search Range
+    local_tz = LOCAL_TZ
+    if now is None:
+        now = datetime.datetime.now(local_tz)
+    
+    # Start from the beginning of yesterday (matches get_date_range)
+    today = now.date()
+    yesterday = today - _DAY
+    start_dt = datetime.datetime.combine(yesterday, datetime.time.min, tzinfo=local_tz)
+    
+    # End at midnight after the last visible day; nothing later is shown
+    last_day_end = yesterday + datetime.timedelta(days=DAYS_TO_SHOW)
+    end_dt = datetime.datetime.combine(last_day_end, datetime.time.min, tzinfo=local_tz)
+
+    # Everything the fetched data depends on
+    window = (start_dt, end_dt, _CONFIG_KEY)
+
+    # Check cache. The data only covers the window it was fetched for, so
+    # after midnight it is refetched even if it has not expired yet.
+    if time.monotonic() < CACHE['expires_at'] and CACHE['window'] == window:
+        return CACHE['data']
+
+    # Another worker process may have refreshed the events already
+    if _load_shared_cache(window):
+        return CACHE['data']
+
+    if not ICLOUD_USERNAME or not ICLOUD_PASSWORD:
+        logger.warning("No credentials provided. Returning empty list.")
+        return {}
+
+    try:
+        calendars_to_fetch = _get_calendars()
 
         if not calendars_to_fetch:
             logger.error("No matching calendars found.")
             return {}
 
         # Initialize data containers
+        # 'timed' is keyed by the date's ordinal (int) for cheap hashing
         data = {
-            'timed': {},
-            'all_day': []
+            'timed': defaultdict(list),
+            'all_day': [],
+            'all_day_starts': []
         }
         
-        # Search Range
-        local_tz = get_timezone()
-        dt_now = datetime.datetime.now(local_tz)
-        
-        # Start from the beginning of yesterday (matches get_date_range)
-        today = dt_now.date()
-        yesterday = today - datetime.timedelta(days=1)
-        start_dt = datetime.datetime.combine(yesterday, datetime.time.min, tzinfo=local_tz)
-        
-        end_dt = dt_now + datetime.timedelta(days=DAYS_TO_SHOW)
+        # Each calendar needs its own requests; overlap the round-trips
+        workers = min(MAX_FETCH_WORKERS, len(calendars_to_fetch))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # A collection's CTag changes whenever any of its events change.
+            # If none moved since the last fetch of this window, one small
+            # PROPFIND per calendar replaces the full REPORT.
+            ctag_futures = [
+                (str(cal.url), executor.submit(get_ctag, cal))
+                for cal, color in calendars_to_fetch
+            ]
+            ctags = [(url, future.result()) for url, future in ctag_futures]
 
-        for target_calendar, color in calendars_to_fetch:
-            logger.info(f"Fetching events from '{target_calendar.name}'...")
-            results = target_calendar.date_search(start=start_dt, end=end_dt, expand=True)
-            
+            if (CACHE['data'] is not None and CACHE['window'] == window
+                    and ctags == CACHE['ctags']
+                    and all(ctag is not None for url, ctag in ctags)):
+                logger.info("Calendars unchanged, keeping cached events")
+                _CALDAV['rebuilt'] = False
+                CACHE['expires_at'] = time.monotonic() + CACHE_DURATION
+                _store_shared_cache()
+                return CACHE['data']
+
+            futures = []
+            for target_calendar, color in calendars_to_fetch:
+                logger.info(f"Fetching events from '{target_calendar.name}'...")
+                future = executor.submit(
+                    target_calendar.search,
+                    start=start_dt, end=end_dt, event=True, expand=True,
+                    split_expanded=False, props=[dav.GetEtag()]
+                )
+                futures.append((future, color))
+
+        results_per_calendar = [(future.result(), color) for future, color in futures]
+
+        # A CTag can change without any change in this window (e.g. an edit
+        # to an event next month). If the same resources came back with the
+        # same ETags, the cached data is still exact; keep it and its
+        # timestamp so client ETags stay valid too.
+        resources = sorted(
+            (str(event.url), event.props.get(dav.GetEtag.tag))
+            for results, color in results_per_calendar
+            for event in results
+        )
+        fingerprint = (window, tuple(resources))
+        if (CACHE['data'] is not None and fingerprint == CACHE['fingerprint']
+                and all(etag is not None for url, etag in resources)):
+            logger.info("Events unchanged, keeping cached events")
+            _CALDAV['rebuilt'] = False
+            CACHE['expires_at'] = time.monotonic() + CACHE_DURATION
+            CACHE['ctags'] = ctags
+            _store_shared_cache()
+            return CACHE['data']
+
+        # Names used per event, bound once as locals
+        etag_tag = dav.GetEtag.tag
+        event_cache = EVENT_CACHE
+        timed_by_ordinal = data['timed']
+        all_day_events = data['all_day']
+
+        # Merge in configuration order so the output is deterministic
+        for results, color in results_per_calendar:
             for event in results:
-                # Parse the vObject
-                # Handle single or multiple VEVENT components (expanded recurrence)
-                vevents = getattr(event.instance, 'vevent_list', [])
-                if not vevents and hasattr(event.instance, 'vevent'):
-                    # Fallback if list not found but single item exists (safety net)
-                    vevents = [event.instance.vevent]
-
-                for ical_data in vevents:
-                    summary = str(ical_data.summary.value)
-                    
-                    description = ""
-                    if hasattr(ical_data, 'description'):
-                        description = str(ical_data.description.value)
-
-                    location = ""
-                    if hasattr(ical_data, 'location'):
-                        location = str(ical_data.location.value)
-                    
-                    dtstart = ical_data.dtstart.value
-                    
-                    if hasattr(ical_data, 'dtend'):
-                        dtend = ical_data.dtend.value
-                    else:
-                        dtend = None
-
-                    is_all_day = not isinstance(dtstart, datetime.datetime)
-                    
-                    if not is_all_day:
-                        if dtstart.tzinfo is None:
-                            dtstart = dtstart.replace(tzinfo=tz.UTC)
-                        
-                        dtstart_local = dtstart.astimezone(local_tz)
-                        date_key = dtstart_local.date()
-                        time_str = dtstart_local.strftime("%H:%M")
-                        
-                        if dtend:
-                            if isinstance(dtend, datetime.datetime):
-                                if dtend.tzinfo is None:
-                                    dtend = dtend.replace(tzinfo=tz.UTC)
-                                dtend_local = dtend.astimezone(local_tz)
-                                end_time_str = dtend_local.strftime("%H:%M")
-                            else:
-                                 end_time_str = ""
-                        else:
-                            end_time_str = (dtstart_local + datetime.timedelta(hours=1)).strftime("%H:%M")
-
-                        if date_key not in data['timed']:
-                            data['timed'][date_key] = []
-                            
-                        data['timed'][date_key].append({
-                            'summary': summary,
-                            'description': description,
-                            'location': location,
-                            'time': time_str,
-                            'end_time': end_time_str,
-                            'is_all_day': False,
-                            'sort_key': dtstart_local,
-                            'color': color  # Inject Color
-                        })
-
-                    else:
-                        if not dtend:
-                            dtend = dtstart + datetime.timedelta(days=1)
-                        elif dtend == dtstart:
-                             dtend = dtstart + datetime.timedelta(days=1)
-                        
-                        data['all_day'].append({
-                            'summary': summary,
-                            'description': description,
-                            'location': location,
-                            'start': dtstart,
-                            'end': dtend,
-                            'is_all_day': True,
-                            'color': color # Inject Color
-                        })
-
-        # Sort timed events within days
-        for day in data['timed']:
-            data['timed'][day].sort(key=lambda x: x['sort_key'])
+                # Reuse the parsed result while the resource is unchanged.
+                # The search start is part of the key because recurrences
+                # are expanded relative to it.
+                etag = event.props.get(etag_tag)
+                cache_key = (str(event.url), etag, start_dt) if etag else None
+                parsed = event_cache.get(cache_key) if cache_key else None
+                if parsed is None:
+                    parsed = parse_event(event, color)
+                    if cache_key:
+                        event_cache[cache_key] = parsed
+                        if len(event_cache) > EVENT_CACHE_SIZE:
+                            event_cache.popitem(last=False)
+                else:
+                    event_cache.move_to_end(cache_key)
+
+                timed, all_day = parsed
+                for date_key, start_seconds, item in timed:
+                    timed_by_ordinal[date_key].append((start_seconds, item))
+                all_day_events.extend(all_day)
+
+        # Sort timed events within days by their integer start offset, then
+        # drop the keys; hand out a plain dict so lookups of empty days
+        # cannot insert keys into the cached data
+        timed_by_day = {}
+        for day, keyed in data['timed'].items():
+            keyed.sort(key=lambda x: x[0])
+            timed_by_day[day] = [item for _, item in keyed]
+        data['timed'] = timed_by_day
+
+        # Sort all-day events by start date, then duration (desc), and keep
+        # the start ordinals alongside for bisecting in the view
+        data['all_day'].sort(key=lambda x: (x['start'], (x['start'] - x['end']).days))
+        data['all_day_starts'] = [ev['start'].toordinal() for ev in data['all_day']]
+
+        # The calendars are known to work now
+        _CALDAV['rebuilt'] = False
 
         # Update Cache
-        CACHE['timestamp'] = now
+        CACHE['expires_at'] = time.monotonic() + CACHE_DURATION
         CACHE['data'] = data
+        CACHE['timestamp'] = datetime.datetime.now(datetime.timezone.utc)
+        CACHE['window'] = window
+        CACHE['ctags'] = ctags
+        CACHE['fingerprint'] = fingerprint
+        _store_shared_cache()
         return data
 
     except Exception as e:
         logger.error(f"Error fetching calendar: {e}")
-        if 'data' in CACHE:
+        # The connection or discovery may be stale (e.g. expired session)
+        reset_caldav()
+        if CACHE['data'] is not None:
             return CACHE['data']
         return {}
 
-@app.route('/')
-def calendar():
-    theme = get_theme_mode()
-    days_to_show = get_date_range() 
-    
+def assign_rows(events):
+    """
+    Assigns each all-day event to the lowest-numbered row that is free on
+    its start date. Events must be sorted by start date.
+    Returns a list of 0-based row indices, parallel to events.
+    """
+    busy = []  # Heap of (row_end, row)
+    free = []  # Heap of rows that are free again
+    row_count = 0
+    assigned = []
+
+    for ev in events:
+        # Starts only increase, so a row freed here stays free for later events
+        while busy and busy[0][0] <= ev['start']:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+
+        if free:
+            row = heapq.heappop(free)
+        else:
+            row = row_count
+            row_count += 1
+
+        heapq.heappush(busy, (ev['end'], row))
+        assigned.append(row)
+
+    return assigned
+
+def build_view(fetched_data, days_to_show, today):
+    """
+    Builds the template context from the fetch_events() result.
+    Returns a tuple (columns, all_day_events). Only depends on the data and
+    the day, so the result is kept in RENDER_CACHE between refreshes.
+    """
     view_start = days_to_show[0]
-    view_end = days_to_show[-1] + datetime.timedelta(days=1)
-    
-    fetched_data = fetch_events()
+    view_end = days_to_show[-1] + _DAY
+
     timed_events = fetched_data.get('timed', {})
     raw_all_day = fetched_data.get('all_day', [])
+    all_day_starts = fetched_data.get('all_day_starts', [])
+    
+    # Column offsets via plain int arithmetic on ordinals
+    view_start_ord = view_start.toordinal()
+    view_end_ord = view_end.toordinal()
     
     # Process All Day Events (Bin Packing)
-    visible_all_day = []
-    for ev in raw_all_day:
-        if ev['start'] < view_end and ev['end'] > view_start:
-            visible_all_day.append(ev)
-            
-    # Sort by start date, then duration (desc)
-    visible_all_day.sort(key=lambda x: (x['start'], (x['start'] - x['end']).days))
+    # raw_all_day is pre-sorted by start date, then duration (desc), so only
+    # the prefix starting before the view end needs to be checked
+    candidates = bisect.bisect_left(all_day_starts, view_end_ord)
+    visible_all_day = [ev for ev in raw_all_day[:candidates] if ev['end'] > view_start]
     
-    rows = [] 
+    rows = assign_rows(visible_all_day)
     processed_all_day = []
     
-    for ev in visible_all_day:
+    for ev, assigned_row in zip(visible_all_day, rows):
         # Calculate visual start/end (clamped to view)
+        start_ord = ev['start'].toordinal()
+        end_ord = ev['end'].toordinal()
         
-        if ev['start'] < view_start:
+        if start_ord < view_start_ord:
             col_start = 1
             is_continuation_left = True
         else:
-            col_start = (ev['start'] - view_start).days + 1
+            col_start = start_ord - view_start_ord + 1
             is_continuation_left = False
             
-        if ev['end'] > view_end:
+        if end_ord > view_end_ord:
             col_end = len(days_to_show) + 1
             is_continuation_right = True
         else:
-            col_end = (ev['end'] - view_start).days + 1
+            col_end = end_ord - view_start_ord + 1
             is_continuation_right = False
             
         col_span = col_end - col_start
         
-        assigned_row = -1
-        for i, row_end in enumerate(rows):
-            if ev['start'] >= row_end:
-                assigned_row = i
-                rows[i] = ev['end']
-                break
+        inclusive_end = ev['end'] - _DAY
         
-        if assigned_row == -1:
-            rows.append(ev['end'])
-            assigned_row = len(rows) - 1
-            
-        inclusive_end = ev['end'] - datetime.timedelta(days=1)
-        
-        start_str = dates.format_date(ev['start'], format='MMM d', locale=LANGUAGE)
-        end_str = dates.format_date(inclusive_end, format='MMM d', locale=LANGUAGE)
+        start_str = _format_date(ev['start'])
+        end_str = _format_date(inclusive_end)
         
         if ev['start'] == inclusive_end:
             date_range_str = start_str
@@ -367,27 +797,24 @@ def calendar():
             'row': assigned_row + 1,
             'is_left': is_continuation_left,
             'is_right': is_continuation_right,
-            'time_str': translations.get_text(LANGUAGE, 'all_day'),
+            'time_str': UI_TEXT['all_day'],
             'date_range': date_range_str,
             'color': ev['color'] # Pass color through
         })
 
     columns = []
-    today = datetime.datetime.now(get_timezone()).date()
-    
-    no_events_text = translations.get_text(LANGUAGE, 'no_events')
 
     for day in days_to_show:
         is_today = (day == today)
         
         if is_today:
-             day_name = translations.get_text(LANGUAGE, 'today')
+             day_name = UI_TEXT['today']
         else:
-             day_name = dates.format_date(day, format='EEEE', locale=LANGUAGE).upper()
+             day_name = _WEEKDAY_NAMES[day.weekday()]
 
-        date_str = dates.format_date(day, format='MMM d', locale=LANGUAGE)
+        date_str = _format_date(day)
         
-        day_events = timed_events.get(day, [])
+        day_events = timed_events.get(day.toordinal(), [])
         
         columns.append({
             'is_today': is_today,
@@ -395,8 +822,70 @@ def calendar():
             'date_str': date_str,
             'events': day_events
         })
-        
-    return render_template('calendar.html', columns=columns, all_day_events=processed_all_day, theme=theme, no_events_text=no_events_text)
+
+    return columns, processed_all_day
+
+def get_view(fetched_data, days_to_show, today):
+    """
+    Returns build_view()'s (columns, all_day_events), reusing RENDER_CACHE
+    while the data object and the day are unchanged.
+    """
+    if RENDER_CACHE['today'] != today or RENDER_CACHE['data'] is not fetched_data:
+        columns, all_day_events = build_view(fetched_data, days_to_show, today)
+        RENDER_CACHE['today'] = today
+        RENDER_CACHE['data'] = fetched_data
+        RENDER_CACHE['columns'] = columns
+        RENDER_CACHE['all_day_events'] = all_day_events
+    return RENDER_CACHE['columns'], RENDER_CACHE['all_day_events']
+
+def page_etag(fetched_data, view_start, theme):
+    """
+    Returns the ETag for a page built from fetched_data, or None if
+    fetched_data is a fallback rather than the cached CalDAV data. The page
+    only depends on the event data, the visible days and the theme, so
+    polling clients can revalidate without a re-render. Fallback pages
+    (e.g. no matching calendars) share CACHE['timestamp'] with the real
+    data and must not get its ETag.
+    """
+    if fetched_data is not CACHE['data'] or CACHE['timestamp'] is None:
+        return None
+    return hashlib.blake2b(
+        f"{CACHE['timestamp']}|{view_start}|{theme}|{LANGUAGE}".encode(),
+        digest_size=16
+    ).hexdigest()
+
+@app.route('/')
+def calendar():
+    # One clock reading per request, shared by all helpers
+    now = datetime.datetime.now(LOCAL_TZ)
+    today = now.date()
+
+    theme = get_theme_mode(now)
+    days_to_show = get_date_range(now)
+    
+    view_start = days_to_show[0]
+    
+    fetched_data = fetch_events(now)
+
+    etag = page_etag(fetched_data, view_start, theme)
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = CLIENT_MAX_AGE
+        return response
+
+    columns, all_day_events = get_view(fetched_data, days_to_show, today)
+    response = make_response(render_template('calendar.html', columns=columns, all_day_events=all_day_events, theme=theme, no_events_text=UI_TEXT['no_events']))
+    if etag is None:
+        # Fallback page; never let clients revalidate against it
+        response.cache_control.no_store = True
+        return response
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = CLIENT_MAX_AGE
+    response.last_modified = CACHE['timestamp']
+    return response
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
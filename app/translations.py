@@ -17,9 +17,14 @@ TRANSLATIONS = {
 
 DEFAULT_LANGUAGE = 'en'
 
+# Per-language strings with the English fallback already merged in
+_RESOLVED = {
+    lang: {**TRANSLATIONS[DEFAULT_LANGUAGE], **strings}
+    for lang, strings in TRANSLATIONS.items()
+}
+
 def get_text(lang, key):
     """
     Retrieve translated text. Falls back to English if lang or key is missing.
     """
-    lang_dict = TRANSLATIONS.get(lang, TRANSLATIONS[DEFAULT_LANGUAGE])
-    return lang_dict.get(key, TRANSLATIONS[DEFAULT_LANGUAGE].get(key, key))
+    return _RESOLVED.get(lang, _RESOLVED[DEFAULT_LANGUAGE]).get(key, key)
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import MagicMock
+import datetime
+import sys
+import os
+
+# Mock external dependencies
+sys.modules['caldav'] = MagicMock()
+sys.modules['caldav.elements'] = MagicMock()
+sys.modules['caldav.elements.base'] = MagicMock()
+sys.modules['flask'] = MagicMock()
+sys.modules['astral'] = MagicMock()
+sys.modules['astral.sun'] = MagicMock()
+sys.modules['babel'] = MagicMock()
+sys.modules['babel.dates'] = MagicMock()
+
+# Add app to path
+project_root = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, 'app'))
+
+from app import main
+
+
+def event(start_day, end_day):
+    base = datetime.date(2024, 1, 1)
+    return {
+        'start': base + datetime.timedelta(days=start_day),
+        'end': base + datetime.timedelta(days=end_day),
+    }
+
+
+class TestAssignRows(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertEqual(main.assign_rows([]), [])
+
+    def test_overlapping_events_stack(self):
+        events = [event(0, 3), event(1, 2), event(1, 4)]
+        self.assertEqual(main.assign_rows(events), [0, 1, 2])
+
+    def test_row_reused_when_free(self):
+        # End dates are exclusive, so an event may start on the day another ends
+        events = [event(0, 2), event(2, 3)]
+        self.assertEqual(main.assign_rows(events), [0, 0])
+
+    def test_lowest_free_row_is_reused(self):
+        # Row 1 frees up before row 0; the next event still takes row 0
+        # once both are free
+        events = [event(0, 3), event(0, 1), event(3, 4)]
+        self.assertEqual(main.assign_rows(events), [0, 1, 0])
+
+    def test_only_free_row_is_used(self):
+        events = [event(0, 5), event(0, 1), event(1, 2), event(2, 6)]
+        self.assertEqual(main.assign_rows(events), [0, 1, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,467 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+import datetime
+import pickle
+import sys
+import os
+import tempfile
+import time
+
+# Mock external dependencies
+sys.modules['caldav'] = MagicMock()
+sys.modules['caldav.elements'] = MagicMock()
+sys.modules['caldav.elements.base'] = MagicMock()
+sys.modules['flask'] = MagicMock()
+sys.modules['astral'] = MagicMock()
+sys.modules['astral.sun'] = MagicMock()
+sys.modules['babel'] = MagicMock()
+sys.modules['babel.dates'] = MagicMock()
+
+# Add app to path
+project_root = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, 'app'))
+
+from app import main
+
+
+def local(day, hour=9, minute=0):
+    return datetime.datetime(2026, 10, day, hour, minute, tzinfo=main.LOCAL_TZ)
+
+
+# Midday on 2026-10-14: the view covers 10-13 up to and including 10-17
+NOW = local(14, 12)
+
+
+class FakeEvent:
+    """A timed CalDAV resource exposing what fetch_events/parse_event read."""
+
+    def __init__(self, url, etag, summary, start):
+        self.url = url
+        self.start = start
+        self.props = {main.dav.GetEtag.tag: etag} if etag else {}
+        component = {'summary': summary, 'dtstart': SimpleNamespace(dt=start)}
+        self.icalendar_instance = SimpleNamespace(walk=lambda name: [component])
+
+
+class FakeCalendar:
+    """A calendar collection that answers CTag and search requests locally."""
+
+    def __init__(self, name, events, ctag='1', url=None):
+        self.name = name
+        self.url = url or f'https://caldav.example.com/{name}/'
+        self.events = events
+        self.ctag = ctag
+        self.error = None
+        self.searches = []
+
+    def search(self, start=None, end=None, **kwargs):
+        if self.error:
+            raise self.error
+        self.searches.append((start, end))
+        return [ev for ev in self.events if start <= ev.start < end]
+
+
+def fake_get_ctag(calendar):
+    if calendar.error:
+        raise calendar.error
+    return calendar.ctag
+
+
+class NamedZone(datetime.tzinfo):
+    """Fixed-offset zone with a pytz-style 'zone' name, as the parsers attach."""
+
+    def __init__(self, zone, hours):
+        self.zone = zone
+        self.offset = datetime.timedelta(hours=hours)
+
+    def utcoffset(self, dt):
+        return self.offset
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+
+class FetchEventsTestCase(unittest.TestCase):
+    """Runs fetch_events() against FakeCalendar objects with fresh caches."""
+
+    # Whether _get_calendars() is replaced by a fixed list of self.calendar
+    fake_discovery = True
+
+    def setUp(self):
+        self.calendar = FakeCalendar('Home', [])
+
+        main.CACHE.update({'expires_at': 0.0, 'data': None, 'timestamp': None,
+                           'window': None, 'ctags': None, 'fingerprint': None})
+        main.EVENT_CACHE.clear()
+        main._CALDAV.update({'client': None, 'calendars': None, 'targets': None, 'rebuilt': False})
+
+        patches = [
+            ('ICLOUD_USERNAME', 'user'),
+            ('ICLOUD_PASSWORD', 'secret'),
+            ('CACHE_FILE', None),
+            ('get_ctag', fake_get_ctag),
+        ]
+        if self.fake_discovery:
+            patches.append(('_get_calendars', lambda: [(self.calendar, '#2962ff')]))
+        for target, value in patches:
+            patcher = patch.object(main, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def refresh(self, now=NOW):
+        """Expires the in-memory cache and fetches again."""
+        main.CACHE['expires_at'] = 0.0
+        return main.fetch_events(now)
+
+    def summaries(self, data, day):
+        return [ev['summary'] for ev in data['timed'].get(day.toordinal(), [])]
+
+
+class TestEventCache(FetchEventsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.parse = MagicMock(wraps=main.parse_event)
+        patcher = patch.object(main, 'parse_event', self.parse)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def parsed_urls(self):
+        return [c.args[0].url for c in self.parse.call_args_list]
+
+    def test_unchanged_resource_is_not_parsed_again(self):
+        self.calendar.events = [
+            FakeEvent('a.ics', '"a1"', 'A', local(14)),
+            FakeEvent('b.ics', '"b1"', 'B', local(15)),
+        ]
+        self.refresh()
+        self.calendar.events[1] = FakeEvent('b.ics', '"b2"', 'B2', local(15))
+        self.calendar.ctag = '2'
+        data = self.refresh()
+
+        self.assertEqual(self.parsed_urls(), ['a.ics', 'b.ics', 'b.ics'])
+        self.assertEqual(self.summaries(data, NOW.date()), ['A'])
+        self.assertEqual(self.summaries(data, local(15).date()), ['B2'])
+
+        # The hit moved to the most recently used end, ahead of the new entry
+        keys = list(main.EVENT_CACHE)
+        self.assertEqual([url for url, etag, start in keys], ['b.ics', 'a.ics', 'b.ics'])
+        self.assertEqual(keys[-2][1], '"a1"')
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.calendar.events = [
+            FakeEvent('a.ics', '"a1"', 'A', local(14)),
+            FakeEvent('b.ics', '"b1"', 'B', local(15)),
+        ]
+        with patch.object(main, 'EVENT_CACHE_SIZE', 2):
+            self.refresh()
+            self.calendar.events[1] = FakeEvent('b.ics', '"b2"', 'B2', local(15))
+            self.calendar.ctag = '2'
+            self.refresh()
+
+        self.assertEqual(
+            [(url, etag) for url, etag, start in main.EVENT_CACHE],
+            [('a.ics', '"a1"'), ('b.ics', '"b2"')]
+        )
+
+    def test_resource_without_etag_is_always_parsed(self):
+        self.calendar.events = [FakeEvent('a.ics', None, 'A', local(14))]
+        self.refresh()
+        self.calendar.ctag = '2'
+        data = self.refresh()
+
+        self.assertEqual(self.parsed_urls(), ['a.ics', 'a.ics'])
+        self.assertEqual(len(main.EVENT_CACHE), 0)
+        self.assertEqual(self.summaries(data, NOW.date()), ['A'])
+
+
+class TestSearchWindow(FetchEventsTestCase):
+
+    def test_fresh_cache_is_served(self):
+        self.calendar.events = [FakeEvent('a.ics', '"a1"', 'A', local(14))]
+        data = main.fetch_events(NOW)
+        self.assertIs(main.fetch_events(NOW + datetime.timedelta(minutes=5)), data)
+        self.assertEqual(len(self.calendar.searches), 1)
+
+    def test_fresh_cache_is_refetched_after_midnight(self):
+        # The last visible day at 23:55 is 10-17; ten minutes later it is 10-18
+        self.calendar.events = [FakeEvent('a.ics', '"a1"', 'Late', local(18, 9))]
+        data = main.fetch_events(local(14, 23, 55))
+        self.assertEqual(self.summaries(data, local(18).date()), [])
+
+        data = main.fetch_events(local(15, 0, 5))
+        self.assertEqual(len(self.calendar.searches), 2)
+        self.assertEqual(self.calendar.searches[1], (local(14, 0), local(19, 0)))
+        self.assertEqual(self.summaries(data, local(18).date()), ['Late'])
+
+
+class TestCTagSkip(FetchEventsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.calendar.events = [FakeEvent('a.ics', '"a1"', 'A', local(14))]
+
+    def test_unchanged_ctags_keep_cached_data(self):
+        data = self.refresh()
+        self.assertIs(self.refresh(), data)
+        self.assertEqual(len(self.calendar.searches), 1)
+
+    def test_changed_window_forces_report(self):
+        self.refresh()
+        self.refresh(NOW + datetime.timedelta(days=1))
+        self.assertEqual(len(self.calendar.searches), 2)
+        self.assertEqual(main.CACHE['window'][:2], (local(14, 0), local(19, 0)))
+
+    def test_changed_config_forces_report(self):
+        self.refresh()
+        with patch.object(main, '_CONFIG_KEY', ('other', 'config')):
+            self.refresh()
+        self.assertEqual(len(self.calendar.searches), 2)
+
+    def test_missing_ctag_forces_report(self):
+        self.calendar.ctag = None
+        data = self.refresh()
+        # A changed event, to tell a new REPORT from the fingerprint skip
+        self.calendar.events = [FakeEvent('a.ics', '"a2"', 'A2', local(14))]
+        refreshed = self.refresh()
+
+        self.assertEqual(len(self.calendar.searches), 2)
+        self.assertIsNot(refreshed, data)
+        self.assertEqual(self.summaries(refreshed, NOW.date()), ['A2'])
+
+
+class TestPageETag(FetchEventsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.calendar.events = [FakeEvent('a.ics', '"a1"', 'A', local(14))]
+        self.view_start = local(13).date()
+
+    def test_cached_data_gets_etag(self):
+        data = self.refresh()
+        etag = main.page_etag(data, self.view_start, 'dark')
+        self.assertIsNotNone(etag)
+        self.assertEqual(main.page_etag(data, self.view_start, 'dark'), etag)
+        self.assertNotEqual(main.page_etag(data, self.view_start, 'light'), etag)
+
+    def test_fallback_data_gets_no_etag(self):
+        self.refresh()
+        # e.g. "No matching calendars found" while the timestamp is unchanged
+        with patch.object(main, '_get_calendars', lambda: []):
+            fallback = self.refresh()
+        self.assertEqual(fallback, {})
+        self.assertIsNone(main.page_etag(fallback, self.view_start, 'dark'))
+
+    def test_no_data_gets_no_etag(self):
+        self.assertIsNone(main.page_etag({}, self.view_start, 'dark'))
+
+
+class TestSharedCache(FetchEventsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.calendar.events = [FakeEvent('a.ics', '"a1"', 'A', local(14))]
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'events.pkl')
+        patcher = patch.object(main, 'CACHE_FILE', self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def other_worker(self):
+        """Drops this process's cache, as if another worker were running."""
+        main.CACHE.update({'expires_at': 0.0, 'data': None, 'timestamp': None,
+                           'window': None, 'ctags': None, 'fingerprint': None})
+
+    def test_fresh_file_is_adopted(self):
+        data = self.refresh()
+        self.other_worker()
+        shared = self.refresh()
+
+        self.assertEqual(len(self.calendar.searches), 1)
+        self.assertEqual(shared, data)
+        self.assertEqual(main.CACHE['window'], (local(13, 0), local(18, 0), main._CONFIG_KEY))
+        self.assertGreater(main.CACHE['expires_at'], time.monotonic())
+
+    def test_stale_file_is_ignored(self):
+        self.refresh()
+        old = time.time() - main.CACHE_DURATION - 1
+        os.utime(self.path, (old, old))
+        self.other_worker()
+        self.refresh()
+        self.assertEqual(len(self.calendar.searches), 2)
+
+    def test_file_for_other_window_is_ignored(self):
+        self.refresh()
+        self.other_worker()
+        self.refresh(NOW + datetime.timedelta(days=1))
+        self.assertEqual(len(self.calendar.searches), 2)
+        self.assertEqual(main.CACHE['window'][0], local(14, 0))
+
+    def test_file_for_other_range_is_ignored(self):
+        # Written with DAYS_TO_SHOW=5, read by a worker showing six days
+        self.calendar.events.append(FakeEvent('b.ics', '"b1"', 'Sixth', local(18)))
+        self.refresh()
+        self.other_worker()
+        with patch.object(main, 'DAYS_TO_SHOW', 6):
+            data = self.refresh()
+        self.assertEqual(len(self.calendar.searches), 2)
+        self.assertEqual(self.summaries(data, local(18).date()), ['Sixth'])
+
+    def test_file_for_other_config_is_ignored(self):
+        # e.g. written before a calendar colour or the timezone was changed
+        self.refresh()
+        self.other_worker()
+        with patch.object(main, '_CONFIG_KEY', ('other', 'config')):
+            self.refresh()
+            # The CTags are unchanged, but the data was not adopted
+            self.refresh()
+        self.assertEqual(len(self.calendar.searches), 2)
+
+    def test_corrupt_file_is_ignored(self):
+        for content in (b'not a pickle', pickle.dumps(['a', 'list']), pickle.dumps({'data': {}})):
+            with self.subTest(content=content):
+                with open(self.path, 'wb') as f:
+                    f.write(content)
+                self.other_worker()
+                searches = len(self.calendar.searches)
+                with patch.object(main, 'logger') as logger:
+                    data = self.refresh()
+                logger.warning.assert_called_once()
+                self.assertEqual(len(self.calendar.searches), searches + 1)
+                self.assertEqual(self.summaries(data, NOW.date()), ['A'])
+
+    def test_temporary_files_are_not_left_behind(self):
+        self.refresh()
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['events.pkl'])
+
+
+class TestFingerprintSkip(FetchEventsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.calendar.events = [
+            FakeEvent('a.ics', '"a1"', 'A', local(14)),
+            FakeEvent('b.ics', '"b1"', 'B', local(15)),
+        ]
+        self.data = self.refresh()
+        self.timestamp = main.CACHE['timestamp']
+        # An edit outside the window changes the CTag, forcing a REPORT
+        self.calendar.ctag = '2'
+
+    def test_same_resources_keep_data_and_timestamp(self):
+        self.assertIs(self.refresh(), self.data)
+        self.assertEqual(len(self.calendar.searches), 2)
+        self.assertEqual(main.CACHE['timestamp'], self.timestamp)
+        self.assertEqual(main.CACHE['ctags'], [(self.calendar.url, '2')])
+
+    def test_changed_etag_rebuilds(self):
+        self.calendar.events[1] = FakeEvent('b.ics', '"b2"', 'B2', local(15))
+        data = self.refresh()
+        self.assertIsNot(data, self.data)
+        self.assertNotEqual(main.CACHE['timestamp'], self.timestamp)
+        self.assertEqual(self.summaries(data, local(15).date()), ['B2'])
+
+    def test_missing_etag_rebuilds(self):
+        self.calendar.events[1] = FakeEvent('b.ics', None, 'B', local(15))
+        first = self.refresh()
+        # Same resources again, but one cannot be compared by ETag
+        self.calendar.ctag = '3'
+        data = self.refresh()
+        self.assertIsNot(data, first)
+        self.assertEqual(len(self.calendar.searches), 3)
+        self.assertEqual(self.summaries(data, local(15).date()), ['B'])
+
+
+class TestCalendarRebuild(FetchEventsTestCase):
+
+    fake_discovery = False
+
+    def setUp(self):
+        super().setUp()
+        self.calendar.events = [FakeEvent('a.ics', '"a1"', 'A', local(14))]
+        self.principal = MagicMock()
+        self.principal.calendars.return_value = [self.calendar, FakeCalendar('Other', [])]
+        client = MagicMock()
+        client.principal.return_value = self.principal
+        self.rebuilt = []
+
+        def rebuild(client, url, name):
+            calendar = FakeCalendar(name, self.calendar.events, self.calendar.ctag, url=url)
+            calendar.error = self.calendar.error
+            self.rebuilt.append(calendar)
+            return calendar
+
+        for target, name, value in [
+            (main, '_get_client', lambda: client),
+            (main, 'TARGET_CONFIG', {'Home': '#2962ff'}),
+            (main.caldav, 'Calendar', MagicMock(side_effect=rebuild)),
+        ]:
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_reset_keeps_targets(self):
+        self.refresh()
+        main.reset_caldav()
+
+        self.assertIsNone(main._CALDAV['calendars'])
+        self.assertEqual(main._CALDAV['targets'], [(self.calendar.url, 'Home', '#2962ff')])
+
+        # The next refresh rebuilds the calendar without discovery
+        self.calendar.ctag = '2'
+        data = self.refresh()
+        self.assertEqual(self.principal.calendars.call_count, 1)
+        self.assertEqual([cal.url for cal in self.rebuilt], [self.calendar.url])
+        self.assertEqual(len(self.rebuilt[0].searches), 1)
+        self.assertFalse(main._CALDAV['rebuilt'])
+        self.assertEqual(self.summaries(data, NOW.date()), ['A'])
+
+    def test_failing_rebuilt_calendar_drops_targets(self):
+        data = self.refresh()
+        main.reset_caldav()
+        self.calendar.error = ConnectionError("calendar moved")
+
+        # Served from the stale cache; the failure resets again
+        self.assertIs(self.refresh(), data)
+        self.assertTrue(self.rebuilt)
+        self.assertIsNone(main._CALDAV['targets'])
+        self.assertFalse(main._CALDAV['rebuilt'])
+
+        # Discovery runs again on the next refresh
+        self.calendar.error = None
+        self.refresh()
+        self.assertEqual(self.principal.calendars.call_count, 2)
+
+    def test_ctag_skip_clears_rebuilt(self):
+        data = self.refresh()
+        main.reset_caldav()
+
+        self.assertIs(self.refresh(), data)
+        self.assertEqual(len(self.rebuilt[0].searches), 0)
+        self.assertFalse(main._CALDAV['rebuilt'])
+
+        # A later failure is treated as transient and keeps the URLs
+        main.reset_caldav()
+        self.assertIsNotNone(main._CALDAV['targets'])
+
+
+class TestToLocal(unittest.TestCase):
+
+    def test_local_zone_by_name_is_kept(self):
+        dt = datetime.datetime(2026, 10, 14, 9, 30, tzinfo=NamedZone(main.LOCAL_TZ.key, 2))
+        self.assertIs(main._to_local(dt), dt)
+
+    def test_other_zone_is_converted(self):
+        dt = datetime.datetime(2026, 10, 14, 9, 30, tzinfo=NamedZone('America/New_York', -4))
+        self.assertEqual(main._to_local(dt), local(14, 15, 30))
+        self.assertIs(main._to_local(dt).tzinfo, main.LOCAL_TZ)
+
+    def test_naive_is_treated_as_utc(self):
+        self.assertEqual(main._to_local(datetime.datetime(2026, 10, 14, 7, 30)), local(14, 9, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
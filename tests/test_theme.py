@@ -1,14 +1,16 @@
 import unittest
 from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+import datetime
 import sys
 import os
 
 # Mock external dependencies
 sys.modules['caldav'] = MagicMock()
+sys.modules['caldav.elements'] = MagicMock()
+sys.modules['caldav.elements.base'] = MagicMock()
 sys.modules['flask'] = MagicMock()
-sys.modules['dateutil'] = MagicMock()
-sys.modules['dateutil.tz'] = MagicMock()
-sys.modules['dateutil.parser'] = MagicMock()
 sys.modules['astral'] = MagicMock()
 sys.modules['astral.sun'] = MagicMock()
 sys.modules['babel'] = MagicMock()
@@ -39,5 +41,115 @@ class TestTheme(unittest.TestCase):
             with patch('app.main.LATITUDE', None):
                 self.assertEqual(main.get_theme_mode(), 'dark')
 
+class TestSunriseSunset(unittest.TestCase):
+
+    def assertClose(self, actual, expected, minutes=3):
+        self.assertLess(abs((actual - expected).total_seconds()), minutes * 60)
+
+    def test_berlin_summer_solstice(self):
+        sunrise, sunset = main._sunrise_sunset(datetime.date(2024, 6, 21), 52.52, 13.405)
+        utc = datetime.timezone.utc
+        self.assertClose(sunrise, datetime.datetime(2024, 6, 21, 2, 43, tzinfo=utc))
+        self.assertClose(sunset, datetime.datetime(2024, 6, 21, 19, 33, tzinfo=utc))
+
+    def test_berlin_winter_solstice(self):
+        sunrise, sunset = main._sunrise_sunset(datetime.date(2024, 12, 21), 52.52, 13.405)
+        utc = datetime.timezone.utc
+        self.assertClose(sunrise, datetime.datetime(2024, 12, 21, 7, 15, tzinfo=utc))
+        self.assertClose(sunset, datetime.datetime(2024, 12, 21, 14, 54, tzinfo=utc))
+
+    def test_polar_day_raises(self):
+        # Svalbard has midnight sun around the summer solstice
+        with self.assertRaises(ValueError):
+            main._sunrise_sunset(datetime.date(2024, 6, 21), 78.22, 15.65)
+
+    def test_local_date_far_from_utc(self):
+        # Apia is UTC+13 at 171.8°W: the UTC date's solar day is the next
+        # local day, so the local date must pick the solar noon
+        apia = ZoneInfo('Pacific/Apia')
+        sunrise, sunset = main._sunrise_sunset(datetime.date(2026, 10, 14), -13.83, -171.76, apia)
+        self.assertClose(sunrise, datetime.datetime(2026, 10, 14, 6, 2, tzinfo=apia))
+        self.assertClose(sunset, datetime.datetime(2026, 10, 14, 18, 24, tzinfo=apia))
+
+
+class AutoThemeTestCase(unittest.TestCase):
+    """Runs get_theme_mode() in 'auto' mode for a patched LOCATION."""
+
+    latitude, longitude = 52.52, 13.405
+
+    def setUp(self):
+        main._SUN_CACHE.update({'date': None, 'light_start_ts': None, 'light_end_ts': None})
+        self.addCleanup(main._SUN_CACHE.update,
+                        {'date': None, 'light_start_ts': None, 'light_end_ts': None})
+        location = SimpleNamespace(latitude=self.latitude, longitude=self.longitude,
+                                   observer=MagicMock())
+        for target, value in [
+            ('THEME', 'auto'),
+            ('LATITUDE', str(self.latitude)),
+            ('LONGITUDE', str(self.longitude)),
+            ('LOCATION', location),
+        ]:
+            patcher = patch.object(main, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def at(self, month, day, hour, minute=0):
+        return datetime.datetime(2024, month, day, hour, minute, tzinfo=main.LOCAL_TZ)
+
+
+class TestPolarWindow(AutoThemeTestCase):
+
+    # Svalbard: the closed form and astral both find no sunrise in June
+    latitude, longitude = 78.22, 15.65
+
+    def test_polar_day_is_cached_as_dark(self):
+        with patch.object(main.astral_sun, 'sunrise', side_effect=ValueError("always above")) as sunrise, \
+                patch.object(main, 'logger') as logger:
+            self.assertEqual(main.get_theme_mode(self.at(6, 21, 12)), 'dark')
+            self.assertEqual(main.get_theme_mode(self.at(6, 21, 13)), 'dark')
+
+        self.assertEqual(sunrise.call_count, 1)
+        logger.warning.assert_called_once()
+        logger.error.assert_not_called()
+
+
+class TestAutoTheme(AutoThemeTestCase):
+
+    # Berlin: light from sunrise + 45min to sunset - 30min, on CEST/CET
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(main, 'LOCAL_TZ', ZoneInfo('Europe/Berlin'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_summer_day(self):
+        # Sunrise 04:43, sunset 21:33: light from 05:28 until 21:03
+        for hour, minute, expected in [
+            (5, 0, 'dark'),
+            (5, 40, 'light'),
+            (12, 0, 'light'),
+            (20, 50, 'light'),
+            (21, 30, 'dark'),
+        ]:
+            with self.subTest(time=f"{hour:02}:{minute:02}"):
+                self.assertEqual(main.get_theme_mode(self.at(6, 21, hour, minute)), expected)
+
+    def test_same_time_on_two_dates(self):
+        # Sunrise is 08:15 at the winter solstice, so 08:30 is still dark
+        self.assertEqual(main.get_theme_mode(self.at(6, 21, 8, 30)), 'light')
+        self.assertEqual(main.get_theme_mode(self.at(12, 21, 8, 30)), 'dark')
+        self.assertEqual(main.get_theme_mode(self.at(12, 21, 16, 0)), 'dark')
+        self.assertEqual(main.get_theme_mode(self.at(12, 21, 12, 0)), 'light')
+
+    def test_window_is_computed_once_per_date(self):
+        with patch.object(main, '_sunrise_sunset', wraps=main._sunrise_sunset) as sunrise_sunset:
+            main.get_theme_mode(self.at(6, 21, 12))
+            main.get_theme_mode(self.at(6, 21, 13))
+            self.assertEqual(sunrise_sunset.call_count, 1)
+
+            main.get_theme_mode(self.at(6, 22, 12))
+            self.assertEqual(sunrise_sunset.call_count, 2)
+        self.assertEqual(main._SUN_CACHE['date'], datetime.date(2024, 6, 22))
+
 if __name__ == '__main__':
     unittest.main()
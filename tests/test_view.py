@@ -0,0 +1,138 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import datetime
+import sys
+import os
+
+# Mock external dependencies
+sys.modules['caldav'] = MagicMock()
+sys.modules['caldav.elements'] = MagicMock()
+sys.modules['caldav.elements.base'] = MagicMock()
+sys.modules['flask'] = MagicMock()
+sys.modules['astral'] = MagicMock()
+sys.modules['astral.sun'] = MagicMock()
+sys.modules['babel'] = MagicMock()
+sys.modules['babel.dates'] = MagicMock()
+
+# Add app to path
+project_root = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, 'app'))
+
+from app import main
+
+
+def day(n):
+    return datetime.date(2026, 10, n)
+
+
+# Five columns, 10-13 up to and including 10-17; the view ends on 10-18
+DAYS = [day(n) for n in range(13, 18)]
+TODAY = day(14)
+
+
+def all_day(summary, start, end):
+    return {'summary': summary, 'description': '', 'location': '',
+            'start': start, 'end': end, 'is_all_day': True, 'color': '#2962ff'}
+
+
+def fetched(all_day_events=(), timed=None):
+    """Builds data shaped like a fetch_events() result."""
+    events = sorted(all_day_events, key=lambda x: (x['start'], (x['start'] - x['end']).days))
+    return {
+        'timed': timed or {},
+        'all_day': events,
+        'all_day_starts': [ev['start'].toordinal() for ev in events],
+    }
+
+
+class TestBuildView(unittest.TestCase):
+
+    def build(self, *events):
+        columns, all_day_events = main.build_view(fetched(events), DAYS, TODAY)
+        return {ev['summary']: ev for ev in all_day_events}
+
+    def test_event_ending_on_view_start_is_hidden(self):
+        # End dates are exclusive: this event's last day is 10-12
+        self.assertEqual(self.build(all_day('Before', day(10), day(13))), {})
+
+    def test_event_starting_on_view_end_is_hidden(self):
+        self.assertEqual(self.build(all_day('After', day(18), day(20))), {})
+
+    def test_events_touching_the_edges_are_shown(self):
+        events = self.build(all_day('First', day(12), day(14)), all_day('Last', day(17), day(18)))
+        self.assertEqual((events['First']['col_start'], events['First']['col_span']), (1, 1))
+        self.assertEqual((events['Last']['col_start'], events['Last']['col_span']), (5, 1))
+
+    def test_continuation_flags(self):
+        events = self.build(
+            all_day('Left', day(11), day(15)),
+            all_day('Inside', day(14), day(16)),
+            all_day('Right', day(16), day(20)),
+            all_day('Both', day(1), day(30)),
+        )
+        flags = {name: (ev['is_left'], ev['is_right'], ev['col_start'], ev['col_span'])
+                 for name, ev in events.items()}
+        self.assertEqual(flags, {
+            'Left': (True, False, 1, 2),
+            'Inside': (False, False, 2, 2),
+            'Right': (False, True, 4, 2),
+            'Both': (True, True, 1, 5),
+        })
+
+    def test_rows_follow_assign_rows(self):
+        events = self.build(
+            all_day('Long', day(13), day(17)),
+            all_day('Overlap', day(14), day(15)),
+            all_day('Later', day(17), day(18)),
+        )
+        self.assertEqual({name: ev['row'] for name, ev in events.items()},
+                         {'Long': 1, 'Overlap': 2, 'Later': 1})
+
+    def test_columns_pick_timed_events_by_ordinal(self):
+        meeting = {'summary': 'Meeting'}
+        data = fetched(timed={day(15).toordinal(): [meeting], day(20).toordinal(): [{}]})
+        columns, all_day_events = main.build_view(data, DAYS, TODAY)
+
+        self.assertEqual([col['is_today'] for col in columns], [False, True, False, False, False])
+        self.assertEqual(columns[1]['day_name'], main.UI_TEXT['today'])
+        self.assertEqual([col['events'] for col in columns], [[], [], [meeting], [], []])
+        self.assertEqual(all_day_events, [])
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        main.RENDER_CACHE.update({'today': None, 'data': None, 'columns': None, 'all_day_events': None})
+        self.build_view = MagicMock(wraps=main.build_view)
+        patcher = patch.object(main, 'build_view', self.build_view)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_data_and_day_is_reused(self):
+        data = fetched([all_day('Trip', day(13), day(15))])
+        first = main.get_view(data, DAYS, TODAY)
+        self.assertEqual(main.get_view(data, DAYS, TODAY), first)
+        self.assertEqual(self.build_view.call_count, 1)
+
+    def test_new_data_object_rebuilds(self):
+        main.get_view(fetched([all_day('Trip', day(13), day(15))]), DAYS, TODAY)
+        # Equal content, but a refresh always hands out a new object
+        columns, all_day_events = main.get_view(fetched([all_day('Trip', day(13), day(15))]), DAYS, TODAY)
+        self.assertEqual(self.build_view.call_count, 2)
+        self.assertEqual([ev['summary'] for ev in all_day_events], ['Trip'])
+
+    def test_new_day_rebuilds(self):
+        data = fetched([all_day('Trip', day(13), day(15))])
+        main.get_view(data, DAYS, TODAY)
+        next_days = [d + datetime.timedelta(days=1) for d in DAYS]
+        columns, all_day_events = main.get_view(data, next_days, TODAY + datetime.timedelta(days=1))
+
+        self.assertEqual(self.build_view.call_count, 2)
+        self.assertEqual([col['is_today'] for col in columns], [False, True, False, False, False])
+        self.assertEqual(all_day_events[0]['col_start'], 1)
+        self.assertEqual(all_day_events[0]['col_span'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()